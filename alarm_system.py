@@ -1,155 +1,206 @@
-"""
-Ghost Detector - Alarm System
-Handles alerts and notifications for ghost detection
-"""
-
-import time
-import threading
-import winsound  # Windows only, replace for other OS
-from datetime import datetime
-from enum import Enum
-
-class AlarmLevel(Enum):
-    NONE = 0
-    WARNING = 1
-    CRITICAL = 2
-    EMERGENCY = 3
-
-class AlarmSystem:
-    def __init__(self):
-        self.alarm_state = AlarmLevel.NONE
-        self.alarm_history = []
-        self.active_alerts = []
-        self.lock = threading.Lock()
-        self.alert_thread = None
-        self.running = True
-        
-    def trigger_alarm(self, analysis):
-        """Trigger alarm based on ghost analysis"""
-        probability = analysis.get('probability', 0)
-        
-        with self.lock:
-            previous_state = self.alarm_state
-            
-            if probability > 90:
-                self.alarm_state = AlarmLevel.EMERGENCY
-                self._add_alert("🚨 EMERGENCY: Extreme paranormal activity detected!", "emergency")
-            elif probability > 80:
-                self.alarm_state = AlarmLevel.CRITICAL
-                self._add_alert("⚠️ CRITICAL: Ghost confirmed - immediate attention required", "critical")
-            elif probability > 60:
-                self.alarm_state = AlarmLevel.WARNING
-                self._add_alert("📢 WARNING: Significant paranormal activity detected", "warning")
-            else:
-                self.alarm_state = AlarmLevel.NONE
-            
-            # Log state change
-            if previous_state != self.alarm_state:
-                self._log_state_change(previous_state, self.alarm_state, analysis)
-                
-            # Trigger sound alert if state increased
-            if self.alarm_state.value > previous_state.value:
-                self._play_alert_sound(self.alarm_state)
-    
-    def _add_alert(self, message, alert_type):
-        """Add an alert to the active list"""
-        alert = {
-            'timestamp': datetime.now().isoformat(),
-            'message': message,
-            'type': alert_type,
-            'acknowledged': False
-        }
-        self.active_alerts.append(alert)
-        
-        # Keep only last 20 active alerts
-        if len(self.active_alerts) > 20:
-            self.active_alerts = self.active_alerts[-20:]
-    
-    def _log_state_change(self, previous, current, analysis):
-        """Log alarm state changes"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'previous_state': previous.name,
-            'current_state': current.name,
-            'probability': analysis.get('probability'),
-            'ghost_type': analysis.get('ghost_type')
-        }
-        self.alarm_history.append(log_entry)
-        
-        # Keep history manageable
-        if len(self.alarm_history) > 100:
-            self.alarm_history = self.alarm_history[-100:]
-    
-    def _play_alert_sound(self, level):
-        """Play audible alert based on alarm level"""
-        def play_sound():
-            if level == AlarmLevel.WARNING:
-                for _ in range(3):
-                    winsound.Beep(800, 200)
-                    time.sleep(0.1)
-            elif level == AlarmLevel.CRITICAL:
-                for _ in range(5):
-                    winsound.Beep(1000, 300)
-                    time.sleep(0.1)
-            elif level == AlarmLevel.EMERGENCY:
-                for _ in range(8):
-                    winsound.Beep(1200, 200)
-                    winsound.Beep(800, 200)
-                    time.sleep(0.1)
-        
-        # Play sound in separate thread
-        sound_thread = threading.Thread(target=play_sound)
-        sound_thread.daemon = True
-        sound_thread.start()
-    
-    def acknowledge_alert(self, alert_index):
-        """Mark an alert as acknowledged"""
-        with self.lock:
-            if 0 <= alert_index < len(self.active_alerts):
-                self.active_alerts[alert_index]['acknowledged'] = True
-                return True
-        return False
-    
-    def clear_alarms(self):
-        """Clear all active alarms"""
-        with self.lock:
-            self.alarm_state = AlarmLevel.NONE
-            self.active_alerts = []
-            self._add_alert("✅ All alarms cleared", "info")
-            return "Alarms cleared"
-    
-    def get_status(self):
-        """Get current alarm system status"""
-        with self.lock:
-            unacknowledged = sum(1 for alert in self.active_alerts 
-                               if not alert['acknowledged'])
-            
-            return {
-                'current_level': self.alarm_state.name,
-                'active_alerts': len(self.active_alerts),
-                'unacknowledged': unacknowledged,
-                'recent_history': self.alarm_history[-5:] if self.alarm_history else []
-            }
-    
-    def get_alerts(self, include_acknowledged=False):
-        """Get list of active alerts"""
-        with self.lock:
-            if include_acknowledged:
-                return self.active_alerts
-            return [a for a in self.active_alerts if not a['acknowledged']]
-    
-    def simulate_emergency(self):
-        """Simulate emergency for testing"""
-        analysis = {
-            'probability': 95,
-            'ghost_type': 'Poltergeist',
-            'evidence': ['EMF Spike: 85 mG', 'Cold Spot: 45°F', 'Spectral Anomaly: 750 MHz']
-        }
-        self.trigger_alarm(analysis)
-        return "🚨 Emergency simulation activated"
-    
-    def shutdown(self):
-        """Shutdown alarm system"""
-        self.running = False
-        self.clear_alarms()
+"""
+Ghost Detector - Alarm System
+Handles alerts and notifications for ghost detection
+"""
+
+import bisect
+import struct
+import threading
+import numpy as np
+import winsound  # Windows only, replace for other OS
+from collections import deque
+from datetime import datetime
+from enum import Enum
+
+class AlarmLevel(Enum):
+    NONE = 0
+    WARNING = 1
+    CRITICAL = 2
+    EMERGENCY = 3
+
+_SAMPLE_RATE = 44100
+
+def _render_pattern(segments):
+    """Render (frequency_hz, duration_ms) segments into a WAV byte buffer
+
+    A frequency of 0 renders silence. Buffers are built once at import so
+    playing an alert is a single async call instead of a beep loop.
+    """
+    chunks = []
+    for freq, duration_ms in segments:
+        n = int(_SAMPLE_RATE * duration_ms / 1000)
+        if freq:
+            tone = np.sin(2 * np.pi * freq * np.arange(n) / _SAMPLE_RATE) * 32000
+        else:
+            tone = np.zeros(n)
+        chunks.append(tone)
+    pcm = np.concatenate(chunks).astype('<i2').tobytes()
+
+    # 44-byte RIFF/WAV header: mono, 16-bit, 44.1 kHz
+    header = struct.pack('<4sI4s4sIHHIIHH4sI',
+                         b'RIFF', 36 + len(pcm), b'WAVE', b'fmt ', 16, 1, 1,
+                         _SAMPLE_RATE, _SAMPLE_RATE * 2, 2, 16,
+                         b'data', len(pcm))
+    return header + pcm
+
+_WARN_WAV = _render_pattern([(800, 200), (0, 100)] * 3)
+_CRIT_WAV = _render_pattern([(1000, 300), (0, 100)] * 5)
+_EMER_WAV = _render_pattern([(1200, 200), (800, 200), (0, 100)] * 8)
+
+class AlarmSystem:
+    # Escalation table, sorted by probability threshold; an index found
+    # with bisect replaces the if/elif ladder in trigger_alarm
+    _THRESHOLDS = (60, 80, 90)
+    _ESCALATION = (
+        (AlarmLevel.WARNING,
+         "📢 WARNING: Significant paranormal activity detected", "warning"),
+        (AlarmLevel.CRITICAL,
+         "⚠️ CRITICAL: Ghost confirmed - immediate attention required", "critical"),
+        (AlarmLevel.EMERGENCY,
+         "🚨 EMERGENCY: Extreme paranormal activity detected!", "emergency"),
+    )
+
+    def __init__(self):
+        self.alarm_state = AlarmLevel.NONE
+        # Bounded deques evict old entries in O(1) instead of re-slicing
+        self.alarm_history = deque(maxlen=100)
+        self.active_alerts = deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.alert_thread = None
+        self.running = True
+        # Read-only status snapshot, replaced wholesale after each state
+        # change; attribute rebinding is atomic so readers need no lock
+        self._status_snapshot = self._build_status()
+
+    def _build_status(self):
+        """Build a fresh status snapshot dict"""
+        unacknowledged = sum(1 for alert in self.active_alerts
+                           if not alert['acknowledged'])
+
+        return {
+            'current_level': self.alarm_state.name,
+            'active_alerts': len(self.active_alerts),
+            'unacknowledged': unacknowledged,
+            'recent_history': list(self.alarm_history)[-5:]
+        }
+
+    def trigger_alarm(self, analysis, ts=None):
+        """Trigger alarm based on a ghost Analysis record"""
+        probability = analysis.probability
+        if ts is None:
+            ts = datetime.now().isoformat()
+
+        # bisect_left counts thresholds strictly below the probability,
+        # matching the old strict > comparisons
+        idx = bisect.bisect_left(self._THRESHOLDS, probability) - 1
+
+        with self.lock:
+            previous_state = self.alarm_state
+
+            if idx < 0:
+                self.alarm_state = AlarmLevel.NONE
+            else:
+                level, message, alert_type = self._ESCALATION[idx]
+                self.alarm_state = level
+                self._add_alert(message, alert_type, ts)
+
+            # Log state change
+            if previous_state != self.alarm_state:
+                self._log_state_change(previous_state, self.alarm_state, analysis, ts)
+
+            new_state = self.alarm_state
+
+        # Publish the refreshed snapshot and spawn the sound thread
+        # outside the lock - neither needs it
+        self._status_snapshot = self._build_status()
+
+        # Trigger sound alert if state increased
+        if new_state.value > previous_state.value:
+            self._play_alert_sound(new_state)
+    
+    def _add_alert(self, message, alert_type, ts=None):
+        """Add an alert to the active list"""
+        if ts is None:
+            ts = datetime.now().isoformat()
+        alert = {
+            'timestamp': ts,
+            'message': message,
+            'type': alert_type,
+            'acknowledged': False
+        }
+        self.active_alerts.append(alert)
+    
+    def _log_state_change(self, previous, current, analysis, ts=None):
+        """Log alarm state changes"""
+        if ts is None:
+            ts = datetime.now().isoformat()
+        log_entry = {
+            'timestamp': ts,
+            'previous_state': previous.name,
+            'current_state': current.name,
+            'probability': analysis.probability,
+            'ghost_type': analysis.ghost_type
+        }
+        self.alarm_history.append(log_entry)
+    
+    _WAVS = {
+        AlarmLevel.WARNING: _WARN_WAV,
+        AlarmLevel.CRITICAL: _CRIT_WAV,
+        AlarmLevel.EMERGENCY: _EMER_WAV
+    }
+
+    def _play_alert_sound(self, level):
+        """Play audible alert based on alarm level"""
+        wav = self._WAVS.get(level)
+        if wav:
+            # Async playback from memory - one call, no beep loop thread
+            winsound.PlaySound(wav, winsound.SND_MEMORY | winsound.SND_ASYNC)
+    
+    def acknowledge_alert(self, alert_index):
+        """Mark an alert as acknowledged"""
+        with self.lock:
+            if 0 <= alert_index < len(self.active_alerts):
+                self.active_alerts[alert_index]['acknowledged'] = True
+            else:
+                return False
+        self._status_snapshot = self._build_status()
+        return True
+
+    def clear_alarms(self):
+        """Clear all active alarms"""
+        with self.lock:
+            self.alarm_state = AlarmLevel.NONE
+            self.active_alerts.clear()
+            self._add_alert("✅ All alarms cleared", "info")
+        self._status_snapshot = self._build_status()
+        return "Alarms cleared"
+
+    def get_status(self):
+        """Get current alarm system status"""
+        # Lock-free read of the last published snapshot
+        return self._status_snapshot
+
+    def get_alerts(self, include_acknowledged=False):
+        """Get list of active alerts"""
+        # Plain deque reads are safe under the GIL; no lock needed
+        if include_acknowledged:
+            return list(self.active_alerts)
+        return [a for a in self.active_alerts if not a['acknowledged']]
+    
+    def simulate_emergency(self):
+        """Simulate emergency for testing"""
+        from ghost_analyzer import Analysis
+        analysis = Analysis(
+            timestamp=datetime.now().isoformat(),
+            probability=95,
+            ghost_type='Poltergeist',
+            evidence=['EMF Spike: 85 mG', 'Cold Spot: 45°F', 'Spectral Anomaly: 750 MHz']
+        )
+        self.trigger_alarm(analysis)
+        return "🚨 Emergency simulation activated"
+    
+    def shutdown(self):
+        """Shutdown alarm system"""
+        self.running = False
+        self.clear_alarms()
         print("🔕 Alarm system shutdown")
\ No newline at end of file
@@ -1,198 +1,339 @@
-"""
-Ghost Detector - Data Logger
-Logs and manages historical detection data
-"""
-
-import json
-import os
-from datetime import datetime, timedelta
-from collections import deque
-import threading
-
-class DataLogger:
-    def __init__(self, log_file="ghost_detector_logs.json"):
-        self.log_file = log_file
-        self.logs = deque(maxlen=1000)
-        self.events = deque(maxlen=500)
-        self.lock = threading.Lock()
-        self._load_logs()
-        
-    def _load_logs(self):
-        """Load existing logs from file"""
-        try:
-            if os.path.exists(self.log_file):
-                with open(self.log_file, 'r') as f:
-                    data = json.load(f)
-                    for log in data.get('logs', []):
-                        self.logs.append(log)
-                    for event in data.get('events', []):
-                        self.events.append(event)
-                print(f"📂 Loaded {len(self.logs)} logs from file")
-        except Exception as e:
-            print(f"⚠️ Could not load logs: {e}")
-    
-    def save_logs(self):
-        """Save logs to file"""
-        try:
-            with open(self.log_file, 'w') as f:
-                json.dump({
-                    'logs': list(self.logs),
-                    'events': list(self.events),
-                    'last_save': datetime.now().isoformat()
-                }, f, indent=2)
-            print(f"💾 Saved {len(self.logs)} logs to file")
-        except Exception as e:
-            print(f"⚠️ Could not save logs: {e}")
-    
-    def log_reading(self, sensor_data, analysis):
-        """Log a sensor reading and analysis"""
-        with self.lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'sensors': sensor_data,
-                'analysis': analysis
-            }
-            self.logs.append(log_entry)
-            
-            # Log significant events
-            if analysis['probability'] > 60:
-                self.log_event({
-                    'type': 'significant_detection',
-                    'timestamp': log_entry['timestamp'],
-                    'probability': analysis['probability'],
-                    'ghost_type': analysis.get('ghost_type'),
-                    'evidence': analysis.get('evidence', [])
-                })
-    
-    def log_event(self, event_data):
-        """Log a specific event"""
-        with self.lock:
-            event_entry = {
-                'timestamp': event_data.get('timestamp', datetime.now().isoformat()),
-                'type': event_data.get('type', 'info'),
-                'data': event_data
-            }
-            self.events.append(event_entry)
-    
-    def get_recent_logs(self, count=50):
-        """Get most recent logs"""
-        with self.lock:
-            return list(self.logs)[-count:]
-    
-    def get_logs_by_date(self, date):
-        """Get logs for a specific date"""
-        with self.lock:
-            result = []
-            for log in self.logs:
-                log_date = log['timestamp'][:10]  # YYYY-MM-DD
-                if log_date == date:
-                    result.append(log)
-            return result
-    
-    def get_events(self, event_type=None, limit=100):
-        """Get logged events"""
-        with self.lock:
-            if event_type:
-                return [e for e in list(self.events)[-limit:] 
-                       if e['data'].get('type') == event_type]
-            return list(self.events)[-limit:]
-    
-    def generate_report(self, hours=24):
-        """Generate a report for the last X hours"""
-        with self.lock:
-            cutoff = datetime.now() - timedelta(hours=hours)
-            recent_logs = [
-                log for log in self.logs 
-                if datetime.fromisoformat(log['timestamp']) > cutoff
-            ]
-            
-            if not recent_logs:
-                return {"error": "No data available for this period"}
-            
-            # Calculate statistics
-            probabilities = [log['analysis']['probability'] for log in recent_logs]
-            avg_probability = sum(probabilities) / len(probabilities) if probabilities else 0
-            
-            detections = [log for log in recent_logs 
-                         if log['analysis']['probability'] > 50]
-            
-            ghost_types = {}
-            for log in detections:
-                ghost_type = log['analysis'].get('ghost_type')
-                if ghost_type:
-                    ghost_types[ghost_type] = ghost_types.get(ghost_type, 0) + 1
-            
-            report = {
-                'period': f"Last {hours} hours",
-                'total_readings': len(recent_logs),
-                'avg_activity': round(avg_probability, 1),
-                'total_detections': len(detections),
-                'max_probability': max(probabilities) if probabilities else 0,
-                'min_probability': min(probabilities) if probabilities else 0,
-                'ghost_type_breakdown': ghost_types,
-                'most_active_hour': self._get_most_active_hour(recent_logs),
-                'generated': datetime.now().isoformat()
-            }
-            
-            return report
-    
-    def _get_most_active_hour(self, logs):
-        """Find the hour with most activity"""
-        hour_count = {}
-        for log in logs:
-            hour = datetime.fromisoformat(log['timestamp']).hour
-            hour_count[hour] = hour_count.get(hour, 0) + 1
-        
-        if hour_count:
-            max_hour = max(hour_count.items(), key=lambda x: x[1])
-            return f"{max_hour[0]:02d}:00 - {max_hour[0]:02d}:59 ({max_hour[1]} readings)"
-        return "Unknown"
-    
-    def export_to_csv(self, filename="ghost_data_export.csv"):
-        """Export data to CSV format"""
-        import csv
-        
-        try:
-            with open(filename, 'w', newline='') as csvfile:
-                fieldnames = ['timestamp', 'emf', 'temperature', 'humidity', 
-                            'pressure', 'spectral', 'motion', 'probability', 
-                            'ghost_type', 'activity_level']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for log in list(self.logs)[-500:]:  # Last 500 entries
-                    row = {
-                        'timestamp': log['timestamp'],
-                        'emf': log['sensors'].get('emf', ''),
-                        'temperature': log['sensors'].get('temperature', ''),
-                        'humidity': log['sensors'].get('humidity', ''),
-                        'pressure': log['sensors'].get('pressure', ''),
-                        'spectral': log['sensors'].get('spectral', ''),
-                        'motion': log['sensors'].get('motion', ''),
-                        'probability': log['analysis'].get('probability', ''),
-                        'ghost_type': log['analysis'].get('ghost_type', ''),
-                        'activity_level': log['analysis'].get('activity_level', '')
-                    }
-                    writer.writerow(row)
-            
-            return f"✅ Data exported to {filename}"
-        except Exception as e:
-            return f"❌ Export failed: {e}"
-    
-    def clear_old_logs(self, days=7):
-        """Clear logs older than specified days"""
-        with self.lock:
-            cutoff = datetime.now() - timedelta(days=days)
-            original_count = len(self.logs)
-            
-            self.logs = deque(
-                [log for log in self.logs 
-                 if datetime.fromisoformat(log['timestamp']) > cutoff],
-                maxlen=1000
-            )
-            
-            removed = original_count - len(self.logs)
-            return f"🗑️ Removed {removed} old logs"
-        
-
+"""
+Ghost Detector - Data Logger
+Logs and manages historical detection data
+"""
+
+import json
+import numpy as np
+import os
+import queue
+import time
+from datetime import datetime
+from collections import deque, Counter
+import threading
+
+try:
+    import orjson
+
+    def _encode_line(obj):
+        """Serialize one log entry to an NDJSON line (bytes)"""
+        return orjson.dumps(obj) + b"\n"
+
+    _decode_line = orjson.loads
+except ImportError:  # orjson is optional - fall back to stdlib json
+    def _encode_line(obj):
+        return (json.dumps(obj, separators=(',', ':')) + "\n").encode()
+
+    _decode_line = json.loads
+
+class DataLogger:
+    _LOG_CAPACITY = 1000
+    _SENSOR_KEYS = ('emf', 'temperature', 'humidity', 'pressure', 'spectral', 'motion')
+
+    def __init__(self, log_file="ghost_detector_logs.json"):
+        self.log_file = log_file
+        self.stream_file = log_file.replace('.json', '.ndjson')
+        # Pre-allocated ring buffer: tail reads are O(k) instead of
+        # materializing the whole deque just to slice its end
+        self._log_ring = [None] * self._LOG_CAPACITY
+        self._log_head = 0
+        self._log_count = 0
+        self.events = deque(maxlen=500)
+        self.lock = threading.Lock()
+        self._load_logs()
+
+        # Background writer: the hot path only enqueues a reference,
+        # serialization and disk I/O happen off-thread in batches
+        self._stream_ok = True
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._drain, daemon=True)
+        self._writer.start()
+
+    def _append_log(self, entry):
+        """Append a log entry to the ring buffer"""
+        self._log_ring[self._log_head % self._LOG_CAPACITY] = entry
+        self._log_head += 1
+        self._log_count = min(self._LOG_CAPACITY, self._log_count + 1)
+
+    def _log_tail(self, count):
+        """Get the last count log entries, oldest first"""
+        count = min(count, self._log_count)
+        cap = self._LOG_CAPACITY
+        start = self._log_head - count
+        return [self._log_ring[(start + i) % cap] for i in range(count)]
+
+    def _iter_logs(self):
+        """Iterate all stored logs, oldest first"""
+        cap = self._LOG_CAPACITY
+        start = self._log_head - self._log_count
+        for i in range(self._log_count):
+            yield self._log_ring[(start + i) % cap]
+
+    _FLUSH_BATCH = 256
+
+    def _drain(self):
+        """Drain queued log entries to the append-only NDJSON file"""
+        try:
+            out = open(self.stream_file, 'ab', buffering=1 << 16)
+        except Exception as e:
+            print(f"⚠️ Could not open log stream: {e}")
+            self._stream_ok = False
+            # Keep consuming so producers and save_logs's join() never
+            # block on a writer that can't write; entries stay in memory
+            # only and are dropped from persistence with the warning above
+            while True:
+                self._write_q.get()
+                self._write_q.task_done()
+
+        while True:
+            # Block for the first entry, then opportunistically batch
+            batch = [self._write_q.get()]
+            try:
+                while len(batch) < self._FLUSH_BATCH:
+                    batch.append(self._write_q.get_nowait())
+            except queue.Empty:
+                pass
+
+            try:
+                # Encode entry-by-entry (constant peak memory) but issue a
+                # single write per batch
+                out.write(b"".join(map(_encode_line, batch)))
+                out.flush()
+                os.fsync(out.fileno())
+            except Exception as e:
+                print(f"⚠️ Could not write log stream: {e}")
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+
+    @staticmethod
+    def _backfill_times(log):
+        """Fill in numeric timestamps on entries from older log formats"""
+        if 'ts_epoch' not in log:
+            try:
+                dt = datetime.fromisoformat(log['timestamp'])
+                log['ts_epoch'] = dt.timestamp()
+                log['ts_hour'] = dt.hour
+            except (KeyError, ValueError):
+                log['ts_epoch'] = 0.0
+                log['ts_hour'] = 0
+        return log
+
+    def _load_logs(self):
+        """Load existing logs from the NDJSON stream"""
+        try:
+            if os.path.exists(self.stream_file):
+                with open(self.stream_file, 'rb') as f:
+                    for line in f:
+                        if line.strip():
+                            entry = _decode_line(line)
+                            # Event lines carry a nested 'data' payload;
+                            # everything else is a sensor log entry
+                            if 'data' in entry:
+                                self.events.append(entry)
+                            else:
+                                self._append_log(self._backfill_times(entry))
+            elif os.path.exists(self.log_file):
+                # Legacy snapshot format from before the NDJSON switch
+                with open(self.log_file, 'r') as f:
+                    data = json.load(f)
+                    for log in data.get('logs', []):
+                        self._append_log(self._backfill_times(log))
+                    for event in data.get('events', []):
+                        self.events.append(event)
+            if self._log_count or self.events:
+                print(f"📂 Loaded {self._log_count} logs and "
+                      f"{len(self.events)} events from file")
+        except Exception as e:
+            print(f"⚠️ Could not load logs: {e}")
+
+    def save_logs(self):
+        """Flush any queued log entries to the NDJSON stream"""
+        try:
+            # Every entry is already streamed incrementally; just wait for
+            # the background writer to finish what's still queued
+            self._write_q.join()
+            if self._stream_ok:
+                print(f"💾 {self._log_count} logs persisted to {self.stream_file}")
+            else:
+                print(f"⚠️ Log stream unavailable - {self._log_count} logs "
+                      "kept in memory only")
+        except Exception as e:
+            print(f"⚠️ Could not save logs: {e}")
+    
+    def log_reading(self, sensor_data, analysis, ts=None):
+        """Log a sensor reading and its Analysis record"""
+        now = time.time()
+        if ts is None:
+            ts = datetime.now().isoformat()
+
+        # Copy only the fields reporting and export actually read, so the
+        # ring never retains the caller's response dicts (or anything the
+        # caller attaches to them afterwards, like spectral bands)
+        log_entry = {
+            'timestamp': ts,
+            # Numeric timestamps so reporting never re-parses ISO strings
+            'ts_epoch': now,
+            'ts_hour': time.localtime(now).tm_hour,
+            'sensors': {k: sensor_data[k] for k in self._SENSOR_KEYS
+                        if k in sensor_data},
+            'analysis': {
+                'probability': analysis.probability,
+                'ghost_type': analysis.ghost_type,
+                'activity_level': analysis.activity_level
+            }
+        }
+        # deque/ring appends are atomic enough under the GIL; no lock on
+        # the hot path
+        self._append_log(log_entry)
+        self._write_q.put(log_entry)
+
+        # Log significant events
+        if analysis.probability > 60:
+            self.log_event({
+                'type': 'significant_detection',
+                'timestamp': ts,
+                'probability': analysis.probability,
+                'ghost_type': analysis.ghost_type,
+                'evidence': analysis.evidence
+            })
+    
+    def log_event(self, event_data, ts=None):
+        """Log a specific event"""
+        if ts is None:
+            ts = event_data.get('timestamp')
+            if ts is None:
+                ts = datetime.now().isoformat()
+        event_entry = {
+            'timestamp': ts,
+            'type': event_data.get('type', 'info'),
+            'data': event_data
+        }
+        self.events.append(event_entry)
+        # Events share the NDJSON stream so they survive restarts too
+        self._write_q.put(event_entry)
+    
+    def get_recent_logs(self, count=50):
+        """Get most recent logs"""
+        return self._log_tail(count)
+    
+    def get_logs_by_date(self, date):
+        """Get logs for a specific date"""
+        result = []
+        for log in self._iter_logs():
+            log_date = log['timestamp'][:10]  # YYYY-MM-DD
+            if log_date == date:
+                result.append(log)
+        return result
+    
+    def get_events(self, event_type=None, limit=100):
+        """Get logged events"""
+        if event_type:
+            return [e for e in list(self.events)[-limit:]
+                   if e['data'].get('type') == event_type]
+        return list(self.events)[-limit:]
+    
+    def generate_report(self, hours=24):
+        """Generate a report for the last X hours"""
+        # Multi-step aggregation needs a consistent view, so keep the lock
+        with self.lock:
+            cutoff = time.time() - hours * 3600
+            recent_logs = [
+                log for log in self._iter_logs()
+                if log['ts_epoch'] > cutoff
+            ]
+            
+            if not recent_logs:
+                return {"error": "No data available for this period"}
+            
+            # Calculate statistics in one vectorized pass
+            probabilities = np.fromiter(
+                (log['analysis']['probability'] for log in recent_logs),
+                dtype=np.float64, count=len(recent_logs)
+            )
+            detections = probabilities > 50
+
+            ghost_types = Counter(
+                log['analysis'].get('ghost_type')
+                for log, hit in zip(recent_logs, detections)
+                if hit and log['analysis'].get('ghost_type')
+            )
+
+            report = {
+                'period': f"Last {hours} hours",
+                'total_readings': len(recent_logs),
+                'avg_activity': round(float(probabilities.mean()), 1),
+                'total_detections': int(detections.sum()),
+                'max_probability': float(probabilities.max()),
+                'min_probability': float(probabilities.min()),
+                'ghost_type_breakdown': dict(ghost_types),
+                'most_active_hour': self._get_most_active_hour(recent_logs),
+                'generated': datetime.now().isoformat()
+            }
+
+            return report
+    
+    def _get_most_active_hour(self, logs):
+        """Find the hour with most activity"""
+        if not logs:
+            return "Unknown"
+
+        # One C-level scan into 24 fixed bins, no dict building
+        log_hours = np.fromiter(
+            (log['ts_hour'] for log in logs), dtype=np.int8, count=len(logs))
+        counts = np.bincount(log_hours, minlength=24)
+        max_hour = int(counts.argmax())
+        return f"{max_hour:02d}:00 - {max_hour:02d}:59 ({int(counts[max_hour])} readings)"
+    
+    def export_to_csv(self, filename="ghost_data_export.csv"):
+        """Export data to CSV format"""
+        import csv
+        import io
+
+        try:
+            # Positional rows through a plain csv.writer with a large
+            # write buffer - no per-row dict allocation like DictWriter
+            with io.TextIOWrapper(open(filename, 'wb', buffering=1 << 16),
+                                  newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(('timestamp', 'emf', 'temperature', 'humidity',
+                                 'pressure', 'spectral', 'motion', 'probability',
+                                 'ghost_type', 'activity_level'))
+                for log in self._log_tail(500):  # Last 500 entries
+                    sensors = log['sensors']
+                    analysis = log['analysis']
+                    writer.writerow((
+                        log['timestamp'],
+                        sensors.get('emf', ''),
+                        sensors.get('temperature', ''),
+                        sensors.get('humidity', ''),
+                        sensors.get('pressure', ''),
+                        sensors.get('spectral', ''),
+                        sensors.get('motion', ''),
+                        analysis.get('probability', ''),
+                        analysis.get('ghost_type', ''),
+                        analysis.get('activity_level', '')
+                    ))
+
+            return f"✅ Data exported to {filename}"
+        except Exception as e:
+            return f"❌ Export failed: {e}"
+    
+    def clear_old_logs(self, days=7):
+        """Clear logs older than specified days"""
+        with self.lock:
+            cutoff = time.time() - days * 86400
+            original_count = self._log_count
+
+            kept = [log for log in self._iter_logs()
+                    if log['ts_epoch'] > cutoff]
+
+            self._log_ring = kept + [None] * (self._LOG_CAPACITY - len(kept))
+            self._log_head = len(kept)
+            self._log_count = len(kept)
+
+            removed = original_count - self._log_count
+            return f"🗑️ Removed {removed} old logs"
+        
+
         
\ No newline at end of file